@@ -1,201 +1,361 @@
 import os
 import json
+import logging
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import google.generativeai as genai
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections held per host; parallel fan-out is capped to this
+POOL_MAXSIZE = 16
+
+# (connect, read) seconds: connect just above the 3s TCP retransmit boundary,
+# read bounded so a stalled gateway surfaces as an error instead of a hang
+REQUEST_TIMEOUT = (3.05, 15)
+
+# Seconds a listing stays fresh, so follow-up questions skip /list-items
+LIST_CACHE_TTL = 30
+
+# Most listings kept at once; the client is shared process-wide and browser
+# paths are free text, so the oldest entries are evicted past this
+LIST_CACHE_MAX_ENTRIES = 64
+
+# Akeyless item types mapped to the buckets reported by count_secrets_by_type
+_TYPE_BUCKET = {
+    "STATIC_SECRET": "static",
+    "ROTATED_SECRET": "rotated",
+    "DYNAMIC_SECRET": "dynamic"
+}
+
+def _error_detail(e):
+    """Response body of a failed request, or the error text when there is none"""
+    # Timeouts, connection errors and RetryError carry response=None
+    resp = getattr(e, "response", None)
+    return resp.text if resp is not None else str(e)
+
 class AkeylessClient:
     """Client to interact with Akeyless API"""
     
-    def __init__(self, access_id, access_key, gateway_url="https://api.akeyless.io"):
+    def __init__(self, access_id, access_key, gateway_url="https://api.akeyless.io", timeout=REQUEST_TIMEOUT):
         self.access_id = access_id
         self.access_key = access_key
         self.gateway_url = gateway_url
-        self.token = None
-        print("✓ Akeyless client initialized")
+        self.timeout = timeout
+        self._token = None
+        self._token_exp = 0.0
+        self._token_lock = threading.Lock()
+        self._list_cache = {}  # key -> (monotonic timestamp, result)
+        self._cache_lock = threading.Lock()
+        
+        # One pooled session for every call so TCP/TLS connections are reused
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
+        # Read timeouts are never retried: the gateway may already have acted
+        # on a POST that timed out, so replaying it is not safe
+        retries = Retry(
+            total=2,
+            read=0,
+            backoff_factor=0.2,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=frozenset(["POST"]),
+            raise_on_status=False  # Hand the last response to raise_for_status()
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=retries))
+        # Every get-dynamic-secret-value call creates a credential, so it is sent once
+        self.session.mount(f"{gateway_url}/get-dynamic-secret-value", HTTPAdapter(max_retries=0))
+        logger.debug("Akeyless client initialized")
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def _get_token(self):
-        """Get a fresh authentication token"""
-        url = f"{self.gateway_url}/auth"
-        payload = {
-            "access-id": self.access_id,
-            "access-key": self.access_key
-        }
+        """Get an authentication token, reusing the cached one until it nears expiry"""
+        if self._token and time.monotonic() < self._token_exp - 30:
+            return self._token
         
-        try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            token = response.json().get("token")
-            return token
-        except Exception as e:
-            print(f"✗ Authentication failed: {str(e)}")
-            raise
+        # Serialize refreshes so parallel callers share one /auth round-trip
+        with self._token_lock:
+            if self._token and time.monotonic() < self._token_exp - 30:
+                return self._token
+            
+            url = f"{self.gateway_url}/auth"
+            payload = {
+                "access-id": self.access_id,
+                "access-key": self.access_key
+            }
+            
+            try:
+                response = self.session.post(url, data=orjson.dumps(payload), timeout=self.timeout)
+                response.raise_for_status()
+                token = orjson.loads(response.content).get("token")
+                self._token = token
+                self._token_exp = time.monotonic() + 900  # Akeyless tokens live ~15 minutes
+                return token
+            except Exception as e:
+                logger.warning("Authentication failed: %s", e)
+                raise
     
-    def get_static_secret(self, secret_name):
-        """Get static secret value"""
-        token = self._get_token()  # Fresh token for each call
-        url = f"{self.gateway_url}/get-secret-value"
-        clean_name = secret_name.lstrip('/')
+    def _clear_token(self):
+        """Drop the cached token so the next call re-authenticates"""
+        self._token = None
+        self._token_exp = 0.0
+    
+    def _post_with_token(self, url, payload):
+        """POST a payload with the current token added to the body, encoded once"""
+        # The v2 API reads the token from the body; it declares no header auth
+        data = orjson.dumps({**payload, "token": self._get_token()})
+        return self.session.post(url, data=data, timeout=self.timeout)
+    
+    def _authed_post(self, path, payload):
+        """POST to an Akeyless endpoint with a token, re-authenticating once on 401"""
+        url = f"{self.gateway_url}/{path}"
         
-        payload = {
-            "token": token,
-            "names": [clean_name],
-            "json": False
-        }
+        response = self._post_with_token(url, payload)
+        if response.status_code == 401:
+            self._clear_token()
+            response = self._post_with_token(url, payload)
         
-        try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            
-            print(f"   ✓ Retrieved secret successfully")
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    def _post_names(self, endpoint, secret_name):
+        """POST a single secret name to a names-based endpoint"""
+        clean_name = secret_name.lstrip('/')
+        payload = {"names": [clean_name], "json": False}
+        return clean_name, self._authed_post(endpoint, payload)
+    
+    def _coerce_secret(self, secret_name, clean_name, result, include_success=False):
+        """Shape the value returned for a secret as structured (JSON object) or simple"""
+        secret = {"name": secret_name}
+        
+        if isinstance(result, dict) and clean_name in result:
+            secret_value = result[clean_name]
             
-            if isinstance(result, dict) and clean_name in result:
-                secret_value = result[clean_name]
-                
-                if isinstance(secret_value, str):
+            if isinstance(secret_value, str):
+                # Only a JSON object is treated as structured, so skip the parse
+                # (and its exception) for opaque values that cannot be one
+                parsed_value = None
+                if secret_value.lstrip().startswith("{"):
                     try:
                         parsed_value = json.loads(secret_value)
-                        if isinstance(parsed_value, dict):
-                            return {
-                                "name": secret_name,
-                                "type": "structured",
-                                "fields": parsed_value,
-                                "success": True
-                            }
                     except json.JSONDecodeError:
                         pass
-                    
-                    return {
-                        "name": secret_name,
-                        "type": "simple",
-                        "value": secret_value,
-                        "success": True
-                    }
+                
+                if isinstance(parsed_value, dict):
+                    secret.update(type="structured", fields=parsed_value)
                 else:
-                    return {"name": secret_name, "value": secret_value, "success": True}
+                    secret.update(type="simple", value=secret_value)
             else:
-                return {"name": secret_name, "value": result, "success": True}
-                
+                secret["value"] = secret_value
+        else:
+            secret["value"] = result
+        
+        if include_success:
+            secret["success"] = True
+        return secret
+    
+    def get_static_secret(self, secret_name: str) -> dict:
+        """Retrieves the value of a static secret from Akeyless."""
+        try:
+            clean_name, result = self._post_names("get-secret-value", secret_name)
+            logger.debug("Retrieved secret %s", secret_name)
+            return self._coerce_secret(secret_name, clean_name, result, include_success=True)
         except Exception as e:
-            error_detail = e.response.text if hasattr(e, 'response') else str(e)
-            print(f"   ✗ Error: {error_detail}")
+            error_detail = _error_detail(e)
+            logger.warning("Error retrieving secret: %s", error_detail)
             return {"error": str(e), "detail": error_detail}
     
-    def get_rotated_secret(self, secret_name):
-        """Get rotated secret details"""
-        token = self._get_token()
-        url = f"{self.gateway_url}/get-rotated-secret-value"
-        clean_name = secret_name.lstrip('/')
+    def get_secrets(self, names: list[str]) -> dict:
+        """Retrieves the values of several static secrets from Akeyless in one request."""
+        clean_names = [name.lstrip('/') for name in names]
         
-        payload = {"token": token, "names": [clean_name], "json": False}
+        payload = {
+            "names": clean_names,
+            "json": False
+        }
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            result = response.json()
+            result = self._authed_post("get-secret-value", payload)
             
-            if isinstance(result, dict) and clean_name in result:
-                secret_value = result[clean_name]
-                
-                if isinstance(secret_value, str):
-                    try:
-                        parsed_value = json.loads(secret_value)
-                        if isinstance(parsed_value, dict):
-                            return {"name": secret_name, "type": "structured", "fields": parsed_value}
-                    except:
-                        pass
+            logger.debug("Retrieved %d secrets", len(names))
+            
+            secrets = {}
+            for name, clean_name in zip(names, clean_names):
+                if isinstance(result, dict) and clean_name in result:
+                    secrets[name] = self._coerce_secret(name, clean_name, result, include_success=True)
+                else:
+                    secrets[name] = {"name": name, "error": "Secret not returned"}
+            return secrets
                 
-                return {"name": secret_name, "value": secret_value}
-            else:
-                return {"name": secret_name, "value": result}
+        except Exception as e:
+            error_detail = _error_detail(e)
+            logger.warning("Error retrieving secret: %s", error_detail)
+            return {"error": str(e), "detail": error_detail}
+    
+    def get_rotated_secret(self, secret_name: str) -> dict:
+        """Retrieves a rotated secret from Akeyless."""
+        try:
+            clean_name, result = self._post_names("get-rotated-secret-value", secret_name)
+            return self._coerce_secret(secret_name, clean_name, result)
         except Exception as e:
             return {"error": str(e)}
     
-    def get_dynamic_secret(self, secret_name):
-        """Get dynamic secret value"""
-        token = self._get_token()
-        url = f"{self.gateway_url}/get-dynamic-secret-value"
+    def get_dynamic_secret(self, secret_name: str) -> dict:
+        """Generates and retrieves a dynamic secret from Akeyless."""
         clean_name = secret_name.lstrip('/')
         
-        payload = {"token": token, "name": clean_name}
+        payload = {"name": clean_name}
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return self._authed_post("get-dynamic-secret-value", payload)
         except Exception as e:
             return {"error": str(e)}
     
-    def list_secrets(self, path="/", secret_type=None):
-        """List all secrets at a given path"""
-        token = self._get_token()
-        url = f"{self.gateway_url}/list-items"
-        
+    def _list_payload(self, path, secret_type=None):
+        """Build the list-items payload for a path and optional type filter"""
         clean_path = path.rstrip('/*').rstrip('/')
         if not clean_path:
             clean_path = "/"
             
-        payload = {"token": token, "path": clean_path}
+        payload = {"path": clean_path}
         
         if secret_type:
             payload["type"] = secret_type
         
+        return payload
+    
+    def list_secrets(self, path: str = "/", secret_type: str = None) -> dict:
+        """Lists all secrets in Akeyless at a given path."""
+        payload = self._list_payload(path, secret_type)
+        key = ("list", payload["path"], secret_type)
+        
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return self._cache_put(key, self._authed_post("list-items", payload))
         except Exception as e:
             return {"error": str(e)}
     
-    def get_secret_metadata(self, secret_name):
-        """Get secret metadata"""
-        token = self._get_token()
-        url = f"{self.gateway_url}/describe-item"
+    def clear_cache(self):
+        """Forget cached listings so the next call hits the gateway"""
+        self._list_cache.clear()
+    
+    def _cache_get(self, key):
+        """Return a cached listing result if it is still fresh, else None"""
+        entry = self._list_cache.get(key)
+        if entry and time.monotonic() - entry[0] < LIST_CACHE_TTL:
+            return entry[1]
+        return None
+    
+    def _cache_put(self, key, result):
+        """Cache a listing result, dropping stale and excess entries, and return it"""
+        now = time.monotonic()
+        cache = self._list_cache
+        
+        # Sessions share the client, so pruning is serialized
+        with self._cache_lock:
+            for old_key, (ts, _) in list(cache.items()):
+                if now - ts >= LIST_CACHE_TTL:
+                    del cache[old_key]
+            
+            # Re-insert so the dict stays ordered oldest first
+            cache.pop(key, None)
+            cache[key] = (now, result)
+            while len(cache) > LIST_CACHE_MAX_ENTRIES:
+                del cache[next(iter(cache))]
+        return result
+    
+    def paginated_list_secrets(self, path="/", secret_type=None, minimal_view=False):
+        """Yield every item at a given path, following list-items pagination"""
+        for page in self._list_pages(path, secret_type, minimal_view):
+            yield from page
+    
+    def _list_pages(self, path, secret_type=None, minimal_view=False):
+        """Yield the item list of each list-items page at a given path"""
+        payload = self._list_payload(path, secret_type)
+        if minimal_view:
+            payload["minimal-view"] = True
+        
+        while True:
+            result = self._authed_post("list-items", payload)
+            yield result.get("items") or []
+            
+            next_page = result.get("next_page")
+            if not next_page:
+                break
+            payload["pagination-token"] = next_page
+    
+    def get_secret_metadata(self, secret_name: str) -> dict:
+        """Gets detailed metadata about a secret."""
         clean_name = secret_name.lstrip('/')
         
-        payload = {"token": token, "name": clean_name}
+        payload = {"name": clean_name}
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return self._authed_post("describe-item", payload)
         except Exception as e:
             return {"error": str(e)}
     
-    def count_secrets_by_type(self, path="/"):
-        """Count secrets by type"""
+    def map_parallel(self, fn, args_iter, max_workers=8):
+        """Apply fn to each argument concurrently over the pooled session, preserving order"""
+        # More workers than pooled connections would open throwaway TLS connections
+        with ThreadPoolExecutor(max_workers=min(max_workers, POOL_MAXSIZE)) as executor:
+            return list(executor.map(fn, args_iter))
+    
+    def describe_all(self, path="/"):
+        """Get metadata for every item at a given path"""
         all_items = self.list_secrets(path)
         
         if "error" in all_items:
             return all_items
         
-        items = all_items.get("items", [])
+        names = [item.get("item_name", "unknown") for item in all_items.get("items", [])]
+        metadata = self.map_parallel(self.get_secret_metadata, names)
+        
+        return dict(zip(names, metadata))
+    
+    def count_secrets_by_type(self, path: str = "/") -> dict:
+        """Counts the total number of secrets and breaks them down by type."""
+        key = ("count", self._list_payload(path)["path"])
+        
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
         
-        counts = {"total": len(items), "static": 0, "rotated": 0, "dynamic": 0, "other": 0}
         items_by_type = {"static": [], "rotated": [], "dynamic": [], "other": []}
         
-        for item in items:
-            item_type = item.get("item_type", "").upper()
-            item_name = item.get("item_name", "unknown")
-            
-            if "STATIC" in item_type:
-                counts["static"] += 1
-                items_by_type["static"].append(item_name)
-            elif "ROTATED" in item_type:
-                counts["rotated"] += 1
-                items_by_type["rotated"].append(item_name)
-            elif "DYNAMIC" in item_type:
-                counts["dynamic"] += 1
-                items_by_type["dynamic"].append(item_name)
-            else:
-                counts["other"] += 1
-                items_by_type["other"].append(item_name)
+        try:
+            # Only item_type and item_name are needed, so ask for the minimal view
+            for item in self.paginated_list_secrets(path, minimal_view=True):
+                bucket = _TYPE_BUCKET.get(item.get("item_type", ""), "other")
+                items_by_type[bucket].append(item.get("item_name", "unknown"))
+        except Exception as e:
+            return {"error": str(e)}
+        
+        # Each count is the length of its name list, so the loop only appends
+        counts = {"total": sum(len(names) for names in items_by_type.values())}
+        counts.update((bucket, len(names)) for bucket, names in items_by_type.items())
         
-        return {"counts": counts, "items_by_type": items_by_type}
+        return self._cache_put(key, {"counts": counts, "items_by_type": items_by_type})
 
 
 class AkeylessGeminiAgent:
@@ -206,55 +366,75 @@ class AkeylessGeminiAgent:
         
         genai.configure(api_key=gemini_api_key)
         
-        self.model = genai.GenerativeModel(
-            model_name='models/gemini-2.5-flash',
-            tools=[
-                self.get_static_secret,
-                self.get_rotated_secret,
-                self.get_dynamic_secret,
-                self.list_secrets,
-                self.get_secret_metadata,
-                self.count_secrets_by_type
-            ]
-        )
-        
-        self.chat_session = self.model.start_chat(history=[])
-        
         self.system_instruction = """You are an AI assistant that helps users manage and retrieve secrets from Akeyless Secret Management. 
 
 You have access to several tools to interact with Akeyless:
 - get_static_secret: For manually managed key-value secrets
+- get_secrets: For fetching several static secrets at once in a single request
 - get_rotated_secret: For automatically rotated secrets (passwords, API keys)
 - get_dynamic_secret: For on-demand generated secrets with TTL (temporary credentials)
 - list_secrets: To browse and list secrets
 - get_secret_metadata: To get detailed information about secrets
 - count_secrets_by_type: To count secrets by type
 
-When users ask about secrets, use the appropriate tool to fetch the information. Be helpful, clear, and security-conscious in your responses."""
-    
-    def get_static_secret(self, secret_name: str) -> dict:
-        """Retrieves the value of a static secret from Akeyless."""
-        return self.akeyless.get_static_secret(secret_name)
-    
-    def get_rotated_secret(self, secret_name: str) -> dict:
-        """Retrieves a rotated secret from Akeyless."""
-        return self.akeyless.get_rotated_secret(secret_name)
-    
-    def get_dynamic_secret(self, secret_name: str) -> dict:
-        """Generates and retrieves a dynamic secret from Akeyless."""
-        return self.akeyless.get_dynamic_secret(secret_name)
-    
-    def list_secrets(self, path: str = "/", secret_type: str = None) -> dict:
-        """Lists all secrets in Akeyless at a given path."""
-        return self.akeyless.list_secrets(path, secret_type)
+When users ask about secrets, use the appropriate tool to fetch the information. When more than one static secret is requested, prefer a single get_secrets call over repeated get_static_secret calls. Be helpful, clear, and security-conscious in your responses."""
+        
+        # Client methods are registered directly; Gemini builds each tool
+        # schema from their type hints and docstrings
+        tools = [
+            self.akeyless.get_static_secret,
+            self.akeyless.get_secrets,
+            self.akeyless.get_rotated_secret,
+            self.akeyless.get_dynamic_secret,
+            self.akeyless.list_secrets,
+            self.akeyless.get_secret_metadata,
+            self.akeyless.count_secrets_by_type
+        ]
+        self._tools = {fn.__name__: fn for fn in tools}
+        
+        # Sent once as the model's system prompt rather than with every user turn
+        self.model = genai.GenerativeModel(
+            model_name='models/gemini-2.5-flash',
+            system_instruction=self.system_instruction,
+            tools=tools
+        )
+        
+        self.chat_session = self.model.start_chat(history=[])
+        
+        # Authenticate now so the token cache and a pooled TLS connection are
+        # warm before the first user turn; the auth call opens the connection
+        try:
+            self.akeyless._get_token()
+        except Exception:
+            pass  # Already logged by the client; the first tool call retries
     
-    def get_secret_metadata(self, secret_name: str) -> dict:
-        """Gets detailed metadata about a secret."""
-        return self.akeyless.get_secret_metadata(secret_name)
+    def _call_tool(self, function_call):
+        """Run a single function call requested by the model"""
+        function_name = function_call.name
+        function_args = dict(function_call.args)
+        
+        logger.debug("tool_call %s args=%s", function_name, function_args)
+        
+        tool = self._tools.get(function_name)
+        if tool:
+            return tool(**function_args)
+        return {"error": f"Unknown function: {function_name}"}
     
-    def count_secrets_by_type(self, path: str = "/") -> dict:
-        """Counts the total number of secrets and breaks them down by type."""
-        return self.akeyless.count_secrets_by_type(path)
+    def _run_tools(self, function_calls):
+        """Run every function call from one model turn and bundle the results in a single reply"""
+        results = self.akeyless.map_parallel(self._call_tool, function_calls)
+        
+        return genai.protos.Content(
+            parts=[
+                genai.protos.Part(
+                    function_response=genai.protos.FunctionResponse(
+                        name=function_call.name,
+                        response={'result': result}
+                    )
+                )
+                for function_call, result in zip(function_calls, results)
+            ]
+        )
     
     def chat(self, user_message):
         """Send a message and get a response from the AI agent"""
@@ -262,54 +442,67 @@ When users ask about secrets, use the appropriate tool to fetch the information.
         print(f"\n🤖 Processing your request...\n")
         
         try:
-            full_message = f"{self.system_instruction}\n\nUser: {user_message}"
-            response = self.chat_session.send_message(full_message)
+            response = self.chat_session.send_message(user_message)
             
-            while response.candidates[0].content.parts:
-                part = response.candidates[0].content.parts[0]
+            while True:
+                function_calls = [
+                    part.function_call
+                    for part in response.candidates[0].content.parts
+                    if getattr(part, 'function_call', None)
+                ]
                 
-                if hasattr(part, 'function_call') and part.function_call:
-                    function_call = part.function_call
-                    function_name = function_call.name
-                    function_args = dict(function_call.args)
-                    
-                    print(f"🔧 Using tool: {function_name}")
-                    print(f"   Input: {json.dumps(function_args, indent=2)}")
-                    
-                    if function_name == "get_static_secret":
-                        result = self.get_static_secret(**function_args)
-                    elif function_name == "get_rotated_secret":
-                        result = self.get_rotated_secret(**function_args)
-                    elif function_name == "get_dynamic_secret":
-                        result = self.get_dynamic_secret(**function_args)
-                    elif function_name == "list_secrets":
-                        result = self.list_secrets(**function_args)
-                    elif function_name == "get_secret_metadata":
-                        result = self.get_secret_metadata(**function_args)
-                    elif function_name == "count_secrets_by_type":
-                        result = self.count_secrets_by_type(**function_args)
-                    else:
-                        result = {"error": f"Unknown function: {function_name}"}
-                    
-                    response = self.chat_session.send_message(
-                        genai.protos.Content(
-                            parts=[
-                                genai.protos.Part(
-                                    function_response=genai.protos.FunctionResponse(
-                                        name=function_name,
-                                        response={'result': result}
-                                    )
-                                )
-                            ]
-                        )
-                    )
-                else:
+                if not function_calls:
                     break
+                
+                response = self.chat_session.send_message(self._run_tools(function_calls))
             
             return response.text
             
         except Exception as e:
             return f"Error: {str(e)}"
+    
+    def chat_stream(self, user_message):
+        """Send a message and yield the AI agent's reply as it is generated"""
+        sent = 0
+        done = False
+        
+        try:
+            response = self.chat_session.send_message(user_message, stream=True)
+            sent += 1
+            
+            while True:
+                function_calls = []
+                
+                # The whole stream has to be consumed before the chat session
+                # accepts the next message, so tool calls are collected first
+                for chunk in response:
+                    parts = chunk.candidates[0].content.parts if chunk.candidates else []
+                    for part in parts:
+                        if getattr(part, 'function_call', None):
+                            function_calls.append(part.function_call)
+                        elif part.text:
+                            yield part.text
+                
+                if not function_calls:
+                    break
+                
+                response = self.chat_session.send_message(self._run_tools(function_calls), stream=True)
+                sent += 1
+            
+            done = True
+        except Exception as e:
+            yield f"Error: {str(e)}"
+        finally:
+            # A caller that stops iterating (e.g. a Streamlit rerun) leaves a
+            # half-read turn, possibly a function call with no response, that
+            # the session would commit on the next send; drop every exchange
+            # of this turn instead
+            if not done:
+                try:
+                    for _ in range(sent):
+                        self.chat_session.rewind()
+                except Exception as e:
+                    logger.warning("Could not rewind interrupted chat turn: %s", e)
 
 
 def main():
@@ -334,37 +527,36 @@ def main():
         return
     
     try:
-        akeyless_client = AkeylessClient(
+        with AkeylessClient(
             access_id=akeyless_access_id,
             access_key=akeyless_access_key,
             gateway_url=akeyless_gateway_url
-        )
-        
-        agent = AkeylessGeminiAgent(akeyless_client, gemini_api_key)
-        
-        print("\n✓ Agent initialized successfully!")
-        print("\nYou can now ask questions about your secrets. Examples:")
-        print("  - 'List all my secrets'")
-        print("  - 'Get the secret secrets/MysecondSecret'")
-        print("  - 'How many secrets do I have?'")
-        print("  - 'Show me MyFirstSecret'")
-        print("\nType 'quit' or 'exit' to stop.\n")
-        
-        while True:
-            user_input = input("You: ").strip()
-            
-            if user_input.lower() in ['quit', 'exit', 'bye']:
-                print("\n👋 Goodbye!")
-                break
+        ) as akeyless_client:
+            agent = AkeylessGeminiAgent(akeyless_client, gemini_api_key)
             
-            if not user_input:
-                continue
+            print("\n✓ Agent initialized successfully!")
+            print("\nYou can now ask questions about your secrets. Examples:")
+            print("  - 'List all my secrets'")
+            print("  - 'Get the secret secrets/MysecondSecret'")
+            print("  - 'How many secrets do I have?'")
+            print("  - 'Show me MyFirstSecret'")
+            print("\nType 'quit' or 'exit' to stop.\n")
             
-            try:
-                response = agent.chat(user_input)
-                print(f"\nAgent: {response}\n")
-            except Exception as e:
-                print(f"\n❌ Error: {str(e)}\n")
+            while True:
+                user_input = input("You: ").strip()
+                
+                if user_input.lower() in ['quit', 'exit', 'bye']:
+                    print("\n👋 Goodbye!")
+                    break
+                
+                if not user_input:
+                    continue
+                
+                try:
+                    response = agent.chat(user_input)
+                    print(f"\nAgent: {response}\n")
+                except Exception as e:
+                    print(f"\n❌ Error: {str(e)}\n")
     
     except Exception as e:
         print(f"\n❌ Failed to initialize agent: {str(e)}")
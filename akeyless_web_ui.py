@@ -1,11 +1,50 @@
 import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
 import os
-import json
+import html
+import time
+from collections import deque
 from dotenv import load_dotenv
-from akeyless_gemini_agent import AkeylessClient, AkeylessGeminiAgent
 
-# Load environment variables
-load_dotenv()
+# Number of most recent chat messages rendered outside the "earlier" expander
+CHAT_WINDOW = 50
+
+# Seconds the sidebar reuses its last stats before asking for new ones
+STATS_REFRESH_SECONDS = 30
+
+# Seconds an agent reply to a quick action is reused when it is asked again
+CHAT_CACHE_TTL = 60
+
+# Sidebar quick-action prompts. Only these are answered from the reply cache:
+# they do not depend on the conversation, unlike follow-ups such as "yes"
+LIST_SECRETS_PROMPT = "List all my secrets"
+SECRET_STATS_PROMPT = "Give me detailed statistics about my secrets"
+CACHEABLE_PROMPTS = frozenset([LIST_SECRETS_PROMPT, SECRET_STATS_PROMPT])
+
+# Default number of chat messages kept in a session; older ones are dropped
+CHAT_HISTORY_LIMIT = 200
+
+# Chat message templates, filled with the HTML-escaped message content
+USER_MESSAGE_TEMPLATE = '<div class="chat-message user-message"><strong style="color: #4dabf7;">👤 You:</strong><br/><span style="color: #ffffff;">{content}</span></div>'
+AGENT_MESSAGE_TEMPLATE = '<div class="chat-message agent-message"><strong style="color: #69db7c;">🤖 Agent:</strong><br/><span style="color: #ffffff;">{content}</span></div>'
+
+# Most item names listed per type on the Analytics tab
+ITEM_LIST_LIMIT = 200
+
+# Characters of a chat message embedded inline; longer replies get a
+# "Show full response" expander
+MESSAGE_PREVIEW_CHARS = 2000
+
+# Secrets shown per page of the Secret Browser table
+BROWSER_PAGE_SIZE = 50
+
+# AkeylessClient method that fetches a value, keyed by the item_type prefix
+# ("STATIC_SECRET" -> "static")
+FETCHERS = {
+    "static": "get_static_secret",
+    "rotated": "get_rotated_secret"
+}
 
 # Page configuration
 st.set_page_config(
@@ -15,8 +54,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better dark mode visibility
-st.markdown("""
+@st.cache_resource(show_spinner=False)
+def _load_env():
+    """Load environment variables from .env once per process"""
+    load_dotenv()
+
+_load_env()
+
+@st.cache_resource
+def _css():
+    """Custom CSS for better dark mode visibility, built once per process"""
+    return """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -51,6 +99,25 @@ st.markdown("""
         color: #ffffff;
         opacity: 0.95;
     }
+    .stats {
+        width: 100%;
+        border-collapse: collapse;
+        border: none;
+    }
+    .stats td {
+        width: 50%;
+        padding: 0.5rem 0;
+        border: none;
+        vertical-align: top;
+    }
+    .stats-label {
+        font-size: 0.875rem;
+        opacity: 0.8;
+    }
+    .stats-value {
+        font-size: 2rem;
+        color: #ffffff !important;
+    }
     .chat-message {
         padding: 1rem;
         border-radius: 10px;
@@ -87,7 +154,11 @@ st.markdown("""
         color: #ffffff !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit rebuilds the page on each rerun, so the stylesheet is still
+# emitted every time; only the string itself is shared
+st.markdown(_css(), unsafe_allow_html=True)
 
 # Initialize session state
 if 'akeyless_client' not in st.session_state:
@@ -95,13 +166,55 @@ if 'akeyless_client' not in st.session_state:
 if 'agent' not in st.session_state:
     st.session_state.agent = None
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = deque(maxlen=CHAT_HISTORY_LIMIT)
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
+if 'chat_cache' not in st.session_state:
+    st.session_state.chat_cache = {}
+
+def message_html(message):
+    """Build a chat history entry's HTML once and keep it on the entry"""
+    if "_html" not in message:
+        template = USER_MESSAGE_TEMPLATE if message["role"] == "user" else AGENT_MESSAGE_TEMPLATE
+        content = message["content"]
+        preview = html.escape(content[:MESSAGE_PREVIEW_CHARS])
+        if len(content) > MESSAGE_PREVIEW_CHARS:
+            preview += "…"
+        message["_html"] = template.format(content=preview)
+    return message["_html"]
+
+def items_html(items):
+    """Join an item list into one HTML block, capped at ITEM_LIST_LIMIT entries"""
+    block = "\n".join(f"<p style='color: #e2e8f0;'>🔹 <code>{html.escape(item)}</code></p>" for item in items[:ITEM_LIST_LIMIT])
+    if len(items) > ITEM_LIST_LIMIT:
+        block += f"\n<p style='color: #a0aec0;'>…and {len(items) - ITEM_LIST_LIMIT} more</p>"
+    return block
+
+def render_message(message):
+    """Render a single chat history entry"""
+    st.markdown(message_html(message), unsafe_allow_html=True)
+    if message["role"] != "user" and len(message["content"]) > MESSAGE_PREVIEW_CHARS:
+        with st.expander("Show full response"):
+            st.text(message["content"])
+
+@st.cache_resource
+def get_akeyless_client(access_id, access_key, gateway_url):
+    """Process-wide Akeyless client, so every session shares one connection pool and token"""
+    from akeyless_gemini_agent import AkeylessClient  # Deferred until the user connects
+    
+    return AkeylessClient(
+        access_id=access_id,
+        access_key=access_key,
+        gateway_url=gateway_url
+    )
 
 def initialize_clients():
     """Initialize Akeyless and AI clients"""
     try:
+        # Deferred so the Gemini SDK is only imported once the user connects;
+        # inside the try so a missing SDK is reported like any other failure
+        from akeyless_gemini_agent import AkeylessGeminiAgent
+        
         akeyless_access_id = os.getenv("AKEYLESS_ACCESS_ID")
         akeyless_access_key = os.getenv("AKEYLESS_ACCESS_KEY")
         akeyless_gateway_url = os.getenv("AKEYLESS_GATEWAY_URL", "https://api.akeyless.io")
@@ -111,12 +224,13 @@ def initialize_clients():
             st.error("❌ Missing environment variables. Please check your .env file.")
             return False
         
-        st.session_state.akeyless_client = AkeylessClient(
-            access_id=akeyless_access_id,
-            access_key=akeyless_access_key,
-            gateway_url=akeyless_gateway_url
+        st.session_state.akeyless_client = get_akeyless_client(
+            akeyless_access_id,
+            akeyless_access_key,
+            akeyless_gateway_url
         )
         
+        # The agent holds this user's Gemini chat history, so it stays per session
         st.session_state.agent = AkeylessGeminiAgent(
             st.session_state.akeyless_client,
             gemini_api_key
@@ -128,6 +242,354 @@ def initialize_clients():
         st.error(f"❌ Initialization failed: {str(e)}")
         return False
 
+def _raise_on_error(result):
+    """Turn an error payload into an exception so st.cache_data does not keep it"""
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_counts(_client, path="/"):
+    """Secret counts by type, cached so reruns skip the gateway round-trip"""
+    return _raise_on_error(_client.count_secrets_by_type(path))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_list(path, filter_type, _client):
+    """Secret listing for a path and type filter"""
+    return _raise_on_error(_client.list_secrets(path, filter_type))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_static(name, _client):
+    """Static secret value"""
+    return _raise_on_error(_client.get_static_secret(name))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_rotated(name, _client):
+    """Rotated secret value"""
+    return _raise_on_error(_client.get_rotated_secret(name))
+
+# Cached counterparts of FETCHERS for the Secret Browser
+CACHED_FETCHERS = {
+    "static": _cached_static,
+    "rotated": _cached_rotated
+}
+
+def _type_key(item_type):
+    """Dispatch key for an Akeyless item type, e.g. ROTATED_SECRET -> rotated"""
+    return item_type.split("_")[0].lower()
+
+def _unsupported(item_name, *args):
+    """Fallback fetcher for item types with no value getter"""
+    return {"error": "Type not supported"}
+
+def _distribution_chart(static, rotated, dynamic, other):
+    """Bar chart of secrets per type"""
+    # Built on every run: a four-bar figure is cheaper to construct than the
+    # pickle round-trip an st.cache_data hit would cost
+    return go.Figure(go.Bar(x=["Static", "Rotated", "Dynamic", "Other"], y=[static, rotated, dynamic, other]))
+
+def fetch_secret_value(client, item):
+    """Fetch the value of a listed item (called from worker threads, so no st.* calls)"""
+    item_name = item.get('item_name', 'Unknown')
+    item_type = item.get('item_type', 'Unknown')
+    
+    return getattr(client, FETCHERS.get(_type_key(item_type), ""), _unsupported)(item_name)
+
+def fetch_secret_values(client, items):
+    """Fetch the values of listed items as {item_name: result}"""
+    static_names = [item.get('item_name', 'Unknown') for item in items if _type_key(item.get('item_type', '')) == "static"]
+    others = [item for item in items if _type_key(item.get('item_type', '')) != "static"]
+    
+    results = {}
+    if static_names:
+        # Static values come back from a single get-secret-value request
+        batch = client.get_secrets(static_names)
+        if isinstance(batch.get("error"), str):
+            batch = {name: {"error": batch["error"]} for name in static_names}
+        results.update(batch)
+    
+    # Rotated (and unsupported) items have no batch endpoint, so pooled threads overlap them
+    if others:
+        fetched = client.map_parallel(lambda item: fetch_secret_value(client, item), others)
+        for item, result in zip(others, fetched):
+            results[item.get('item_name', 'Unknown')] = result
+    return results
+
+def cached_reply(prompt):
+    """Return this session's recent reply to a quick-action prompt, or None"""
+    entry = st.session_state.chat_cache.get(prompt)
+    if entry and time.monotonic() - entry[0] < CHAT_CACHE_TTL:
+        return entry[1]
+    return None
+
+def cache_reply(prompt, response):
+    """Remember a quick-action reply for CHAT_CACHE_TTL seconds"""
+    if prompt in CACHEABLE_PROMPTS:
+        st.session_state.chat_cache[prompt] = (time.monotonic(), response)
+
+@st.fragment
+def chat_panel():
+    """Chat tab, run as a fragment so sending a message skips the sidebar and other tabs"""
+    st.markdown("### 💬 Ask me anything about your secrets!")
+    st.markdown("<p style='color: #a0aec0; margin-bottom: 2rem;'>Type your questions below and I'll help you manage your Akeyless secrets.</p>", unsafe_allow_html=True)
+    
+    # Display chat history: only the most recent window renders on every
+    # rerun. Older messages are not emitted at all until asked for, since
+    # a collapsed st.expander would still send its whole body each time
+    history = list(st.session_state.chat_history)  # deques cannot be sliced
+    older = history[:-CHAT_WINDOW]
+    recent = history[-CHAT_WINDOW:]
+    
+    if older and st.toggle(f"Load {len(older)} earlier messages", key="show_earlier"):
+        with st.expander(f"Earlier messages ({len(older)})", expanded=True):
+            for message in older:
+                render_message(message)
+    
+    for message in recent:
+        render_message(message)
+    
+    # Chat input; sidebar quick actions queue their prompt for this run
+    user_input = st.chat_input("Type your question here... (e.g., 'Get the secret MyFirstSecret')")
+    user_input = user_input or st.session_state.pop('pending_prompt', None)
+    
+    if user_input:
+        # Add user message to history
+        st.session_state.chat_history.append({
+            "role": "user",
+            "content": user_input
+        })
+        render_message(st.session_state.chat_history[-1])
+        
+        # Stream the agent response into place as it is generated; the
+        # reply is already on screen, so no st.rerun() is needed after
+        placeholder = st.empty()
+        response = cached_reply(user_input)
+        if response is None:
+            response = ""
+            with st.spinner("🤖 Agent is thinking..."):
+                try:
+                    for text in st.session_state.agent.chat_stream(user_input):
+                        response += text
+                        placeholder.markdown(AGENT_MESSAGE_TEMPLATE.format(content=html.escape(response[:MESSAGE_PREVIEW_CHARS])), unsafe_allow_html=True)
+                except Exception as e:
+                    response = f"Error: {str(e)}"
+            
+            if not response.startswith("Error:"):
+                cache_reply(user_input, response)
+        
+        message = {
+            "role": "agent",
+            "content": response
+        }
+        st.session_state.chat_history.append(message)
+        with placeholder.container():
+            render_message(message)
+
+def _next_browser_page(pages):
+    """Advance the Secret Browser one page, before its Page input is drawn"""
+    st.session_state.browser_page = min(st.session_state.browser_page + 1, pages)
+
+@st.fragment
+def secret_browser_tab():
+    """Secret Browser section, rerun on its own when its widgets change"""
+    st.markdown("### 🔍 Browse Your Secrets")
+    st.markdown("<p style='color: #a0aec0;'>Search and explore your Akeyless secrets by path and type.</p>", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        path_input = st.text_input("Path", value="/", placeholder="Enter path (e.g., /prod)")
+    with col2:
+        secret_type = st.selectbox("Filter by Type", ["All", "Static", "Rotated", "Dynamic"])
+    
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("🔍 Search", type="primary"):
+            # Kept in session state so the results (and their Get Value
+            # buttons) survive the rerun that each button click triggers
+            filter_type = None if secret_type == "All" else secret_type.lower()
+            st.session_state.browser_query = (path_input, filter_type)
+            st.session_state.browser_page = 1
+    with col2:
+        fetch_all = st.button("📥 Fetch all")
+    with col3:
+        if st.button("↻ Refresh"):
+            _cached_list.clear()
+            _cached_static.clear()
+            _cached_rotated.clear()
+            _cached_counts.clear()
+            st.session_state.akeyless_client.clear_cache()
+            # Lift the sidebar debounce so its stats are refetched too
+            st.session_state.pop('_stats_cache', None)
+    
+    if st.session_state.get('browser_query'):
+        with st.spinner("Searching..."):
+            try:
+                query_path, filter_type = st.session_state.browser_query
+                secrets = _cached_list(query_path, filter_type, st.session_state.akeyless_client)
+                
+                items = secrets.get('items', [])
+                
+                if items:
+                    st.success(f"✅ Found {len(items)} secrets")
+                    
+                    # Only one page of the listing is rendered (and fetched by
+                    # "Fetch all"); the full listing stays in _cached_list
+                    pages = -(-len(items) // BROWSER_PAGE_SIZE)
+                    st.session_state.browser_page = min(st.session_state.get('browser_page', 1), pages)
+                    
+                    col1, col2, col3 = st.columns([1, 1, 4])
+                    with col1:
+                        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="browser_page")
+                    with col2:
+                        st.button("Next page ▶", on_click=_next_browser_page, args=(pages,), disabled=page >= pages)
+                    with col3:
+                        st.markdown(f"<p style='color: #a0aec0; margin-top: 2rem;'>Page {page} of {pages}</p>", unsafe_allow_html=True)
+                    
+                    start = (page - 1) * BROWSER_PAGE_SIZE
+                    page_items = items[start:start + BROWSER_PAGE_SIZE]
+                    
+                    if fetch_all:
+                        results = fetch_secret_values(st.session_state.akeyless_client, page_items)
+                        
+                        values = {}
+                        for item in page_items:
+                            item_name = item.get('item_name', 'Unknown')
+                            result = results.get(item_name, {"error": "Secret not returned"})
+                            if "error" in result:
+                                values[item_name] = {"error": result.get("error")}
+                            elif result.get("type") == "structured":
+                                values[item_name] = result.get("fields")
+                            else:
+                                values[item_name] = result.get("value")
+                        
+                        # One element for every value instead of one per secret
+                        st.json(values)
+                    
+                    # One table component with row selection instead of an
+                    # expander, two columns and a button per secret
+                    table = pd.DataFrame(page_items, columns=["item_name", "item_type"])
+                    event = st.dataframe(
+                        table,
+                        on_select="rerun",
+                        selection_mode="single-row",
+                        hide_index=True,
+                        use_container_width=True,
+                        key=f"browser_table_{page}"
+                    )
+                    
+                    # Single detail panel for the selected secret
+                    if event.selection.rows:
+                        item = page_items[event.selection.rows[0]]
+                        item_name = item.get('item_name', 'Unknown')
+                        item_type = item.get('item_type', 'Unknown')
+                        
+                        st.markdown(f"<p style='color: #a0aec0;'><strong>Type:</strong> {html.escape(item_type)}</p>", unsafe_allow_html=True)
+                        st.markdown(f"<p style='color: #a0aec0;'><strong>Path:</strong> {html.escape(item_name)}</p>", unsafe_allow_html=True)
+                        
+                        if st.button("📥 Get value for selected"):
+                            try:
+                                fetch = CACHED_FETCHERS.get(_type_key(item_type), _unsupported)
+                                result = fetch(item_name, st.session_state.akeyless_client)
+                                
+                                if "error" not in result:
+                                    if result.get("type") == "structured":
+                                        st.json(result.get("fields"))
+                                    else:
+                                        st.code(result.get("value"))
+                                else:
+                                    st.error(result.get("error"))
+                            except Exception as e:
+                                st.error(f"Error: {str(e)}")
+                else:
+                    st.info("ℹ️ No secrets found at this path")
+                    
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+@st.fragment
+def analytics_tab():
+    """Analytics section, rerun on its own and only built while selected"""
+    st.markdown("### 📊 Secret Analytics")
+    st.markdown("<p style='color: #a0aec0; margin-bottom: 2rem;'>Visual overview of your secrets distribution and statistics.</p>", unsafe_allow_html=True)
+    
+    try:
+        stats = _cached_counts(st.session_state.akeyless_client)
+        counts = stats.get('counts', {})
+        items_by_type = stats.get('items_by_type', {})
+        
+        # Display metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.markdown(f"""
+            <div class="stat-box">
+                <div class="stat-number">{counts.get('total', 0)}</div>
+                <div class="stat-label">Total Secrets</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+            <div class="stat-box" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
+                <div class="stat-number">{counts.get('static', 0)}</div>
+                <div class="stat-label">Static Secrets</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown(f"""
+            <div class="stat-box" style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);">
+                <div class="stat-number">{counts.get('rotated', 0)}</div>
+                <div class="stat-label">Rotated Secrets</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col4:
+            st.markdown(f"""
+            <div class="stat-box" style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);">
+                <div class="stat-number">{counts.get('dynamic', 0)}</div>
+                <div class="stat-label">Dynamic Secrets</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+        
+        # Breakdown by type
+        st.markdown("### 📋 Secrets by Type")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("<h4 style='color: #4dabf7;'>Static Secrets</h4>", unsafe_allow_html=True)
+            static_items = items_by_type.get('static', [])
+            if static_items:
+                st.markdown(items_html(static_items), unsafe_allow_html=True)
+            else:
+                st.info("ℹ️ No static secrets")
+        
+        with col2:
+            st.markdown("<h4 style='color: #4dabf7;'>Rotated Secrets</h4>", unsafe_allow_html=True)
+            rotated_items = items_by_type.get('rotated', [])
+            if rotated_items:
+                st.markdown(items_html(rotated_items), unsafe_allow_html=True)
+            else:
+                st.info("ℹ️ No rotated secrets")
+        
+        # Chart
+        st.markdown("---")
+        st.markdown("<h3 style='color: #4dabf7;'>📈 Distribution Chart</h3>", unsafe_allow_html=True)
+        
+        chart = _distribution_chart(
+            counts.get('static', 0),
+            counts.get('rotated', 0),
+            counts.get('dynamic', 0),
+            counts.get('other', 0)
+        )
+        st.plotly_chart(chart, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"❌ Unable to load analytics: {str(e)}")
+
 # Header
 st.markdown('<div class="main-header">🔐 Akeyless AI Assistant</div>', unsafe_allow_html=True)
 
@@ -148,45 +610,67 @@ with st.sidebar:
         
         st.markdown("### 📊 Quick Stats")
         try:
-            stats = st.session_state.akeyless_client.count_secrets_by_type()
-            counts = stats.get('counts', {})
+            # Time-gate the fetch so rapid clicks reuse the last stats
+            # without even going through the cache lookup. The first fetch
+            # is keyed on the missing cache, not on a zero timestamp, since
+            # monotonic() may itself be under 30s on a freshly booted host
+            now = time.monotonic()
+            if '_stats_cache' not in st.session_state or now - st.session_state._stats_ts > STATS_REFRESH_SECONDS:
+                st.session_state._stats_cache = _cached_counts(st.session_state.akeyless_client)
+                st.session_state._stats_ts = now
+            counts = st.session_state._stats_cache.get('counts', {})
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Total Secrets", counts.get('total', 0))
-                st.metric("Static", counts.get('static', 0))
-            with col2:
-                st.metric("Rotated", counts.get('rotated', 0))
-                st.metric("Dynamic", counts.get('dynamic', 0))
+            # One markdown element instead of four st.metric components
+            st.markdown(
+                "<table class='stats'>"
+                f"<tr><td><div class='stats-label'>Total Secrets</div><div class='stats-value'>{counts.get('total', 0)}</div></td>"
+                f"<td><div class='stats-label'>Rotated</div><div class='stats-value'>{counts.get('rotated', 0)}</div></td></tr>"
+                f"<tr><td><div class='stats-label'>Static</div><div class='stats-value'>{counts.get('static', 0)}</div></td>"
+                f"<td><div class='stats-label'>Dynamic</div><div class='stats-value'>{counts.get('dynamic', 0)}</div></td></tr>"
+                "</table>",
+                unsafe_allow_html=True
+            )
         except:
             st.warning("Unable to load stats")
         
         st.markdown("---")
         st.markdown("### 💡 Quick Actions")
+        # Quick actions hand their prompt to the chat panel, which answers
+        # repeats within CHAT_CACHE_TTL from the reply cache
         if st.button("📋 List All Secrets"):
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": "List all my secrets"
-            })
-            st.rerun()
+            st.session_state.pending_prompt = LIST_SECRETS_PROMPT
+            st.session_state.active_tab = "💬 Chat Assistant"
         
         if st.button("📊 Secret Statistics"):
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": "Give me detailed statistics about my secrets"
-            })
-            st.rerun()
+            st.session_state.pending_prompt = SECRET_STATS_PROMPT
+            st.session_state.active_tab = "💬 Chat Assistant"
         
         st.markdown("---")
+        history_limit = st.number_input(
+            "Messages kept in chat history",
+            min_value=20,
+            max_value=1000,
+            value=st.session_state.chat_history.maxlen,
+            step=20
+        )
+        if history_limit != st.session_state.chat_history.maxlen:
+            st.session_state.chat_history = deque(st.session_state.chat_history, maxlen=int(history_limit))
+        
         if st.button("🔄 Clear Chat History"):
-            st.session_state.chat_history = []
-            st.rerun()
+            st.session_state.chat_history.clear()
+            st.session_state.chat_cache.clear()
         
         if st.button("🚪 Disconnect"):
+            # The Akeyless client is shared by every session, so it is only
+            # dropped here; closing it would cut the other sessions' pool
             st.session_state.authenticated = False
             st.session_state.akeyless_client = None
             st.session_state.agent = None
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
+            st.session_state.chat_cache.clear()
+            st.session_state.browser_query = None
+            st.session_state.browser_page = 1
+            st.session_state.pop('_stats_cache', None)
             st.rerun()
 
 # Main content
@@ -222,193 +706,22 @@ if not st.session_state.authenticated:
         """)
 
 else:
-    # Create tabs
-    tab1, tab2, tab3 = st.tabs(["💬 Chat Assistant", "📁 Secret Browser", "📊 Analytics"])
-    
-    # Tab 1: Chat Assistant
-    with tab1:
-        st.markdown("### 💬 Ask me anything about your secrets!")
-        st.markdown("<p style='color: #a0aec0; margin-bottom: 2rem;'>Type your questions below and I'll help you manage your Akeyless secrets.</p>", unsafe_allow_html=True)
-        
-        # Display chat history
-        for message in st.session_state.chat_history:
-            if message["role"] == "user":
-                st.markdown(f'<div class="chat-message user-message"><strong style="color: #4dabf7;">👤 You:</strong><br/><span style="color: #ffffff;">{message["content"]}</span></div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="chat-message agent-message"><strong style="color: #69db7c;">🤖 Agent:</strong><br/><span style="color: #ffffff;">{message["content"]}</span></div>', unsafe_allow_html=True)
-        
-        # Chat input
-        user_input = st.chat_input("Type your question here... (e.g., 'Get the secret MyFirstSecret')")
-        
-        if user_input:
-            # Add user message to history
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": user_input
-            })
-            
-            # Get agent response
-            with st.spinner("🤖 Agent is thinking..."):
-                try:
-                    response = st.session_state.agent.chat(user_input)
-                    st.session_state.chat_history.append({
-                        "role": "agent",
-                        "content": response
-                    })
-                except Exception as e:
-                    st.session_state.chat_history.append({
-                        "role": "agent",
-                        "content": f"Error: {str(e)}"
-                    })
-            
-            st.rerun()
-    
-    # Tab 2: Secret Browser
-    with tab2:
-        st.markdown("### 🔍 Browse Your Secrets")
-        st.markdown("<p style='color: #a0aec0;'>Search and explore your Akeyless secrets by path and type.</p>", unsafe_allow_html=True)
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            path_input = st.text_input("Path", value="/", placeholder="Enter path (e.g., /prod)")
-        with col2:
-            secret_type = st.selectbox("Filter by Type", ["All", "Static", "Rotated", "Dynamic"])
-        
-        if st.button("🔍 Search", type="primary"):
-            with st.spinner("Searching..."):
-                try:
-                    filter_type = None if secret_type == "All" else secret_type.lower()
-                    secrets = st.session_state.akeyless_client.list_secrets(path_input, filter_type)
-                    
-                    items = secrets.get('items', [])
-                    
-                    if items:
-                        st.success(f"✅ Found {len(items)} secrets")
-                        
-                        for item in items:
-                            item_name = item.get('item_name', 'Unknown')
-                            item_type = item.get('item_type', 'Unknown')
-                            
-                            with st.expander(f"🔐 {item_name} ({item_type})", expanded=False):
-                                col1, col2 = st.columns([3, 1])
-                                
-                                with col1:
-                                    st.markdown(f"<p style='color: #a0aec0;'><strong>Type:</strong> {item_type}</p>", unsafe_allow_html=True)
-                                    st.markdown(f"<p style='color: #a0aec0;'><strong>Path:</strong> {item_name}</p>", unsafe_allow_html=True)
-                                
-                                with col2:
-                                    if st.button(f"📥 Get Value", key=f"get_{item_name}"):
-                                        try:
-                                            if "STATIC" in item_type:
-                                                result = st.session_state.akeyless_client.get_static_secret(item_name)
-                                            elif "ROTATED" in item_type:
-                                                result = st.session_state.akeyless_client.get_rotated_secret(item_name)
-                                            else:
-                                                result = {"error": "Type not supported"}
-                                            
-                                            if "error" not in result:
-                                                if result.get("type") == "structured":
-                                                    st.json(result.get("fields"))
-                                                else:
-                                                    st.code(result.get("value"))
-                                            else:
-                                                st.error(result.get("error"))
-                                        except Exception as e:
-                                            st.error(f"Error: {str(e)}")
-                    else:
-                        st.info("ℹ️ No secrets found at this path")
-                        
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+    # Only the selected section runs; st.tabs executes every tab body on
+    # each rerun, including the Analytics network call and chart
+    active_tab = st.radio(
+        "Section",
+        ["💬 Chat Assistant", "📁 Secret Browser", "📊 Analytics"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_tab"
+    )
     
-    # Tab 3: Analytics
-    with tab3:
-        st.markdown("### 📊 Secret Analytics")
-        st.markdown("<p style='color: #a0aec0; margin-bottom: 2rem;'>Visual overview of your secrets distribution and statistics.</p>", unsafe_allow_html=True)
-        
-        try:
-            stats = st.session_state.akeyless_client.count_secrets_by_type()
-            counts = stats.get('counts', {})
-            items_by_type = stats.get('items_by_type', {})
-            
-            # Display metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(f"""
-                <div class="stat-box">
-                    <div class="stat-number">{counts.get('total', 0)}</div>
-                    <div class="stat-label">Total Secrets</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                <div class="stat-box" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
-                    <div class="stat-number">{counts.get('static', 0)}</div>
-                    <div class="stat-label">Static Secrets</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(f"""
-                <div class="stat-box" style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);">
-                    <div class="stat-number">{counts.get('rotated', 0)}</div>
-                    <div class="stat-label">Rotated Secrets</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown(f"""
-                <div class="stat-box" style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);">
-                    <div class="stat-number">{counts.get('dynamic', 0)}</div>
-                    <div class="stat-label">Dynamic Secrets</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("---")
-            
-            # Breakdown by type
-            st.markdown("### 📋 Secrets by Type")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("<h4 style='color: #4dabf7;'>Static Secrets</h4>", unsafe_allow_html=True)
-                static_items = items_by_type.get('static', [])
-                if static_items:
-                    for item in static_items:
-                        st.markdown(f"<p style='color: #e2e8f0;'>🔹 <code>{item}</code></p>", unsafe_allow_html=True)
-                else:
-                    st.info("ℹ️ No static secrets")
-            
-            with col2:
-                st.markdown("<h4 style='color: #4dabf7;'>Rotated Secrets</h4>", unsafe_allow_html=True)
-                rotated_items = items_by_type.get('rotated', [])
-                if rotated_items:
-                    for item in rotated_items:
-                        st.markdown(f"<p style='color: #e2e8f0;'>🔹 <code>{item}</code></p>", unsafe_allow_html=True)
-                else:
-                    st.info("ℹ️ No rotated secrets")
-            
-            # Chart
-            st.markdown("---")
-            st.markdown("<h3 style='color: #4dabf7;'>📈 Distribution Chart</h3>", unsafe_allow_html=True)
-            
-            chart_data = {
-                'Type': ['Static', 'Rotated', 'Dynamic', 'Other'],
-                'Count': [
-                    counts.get('static', 0),
-                    counts.get('rotated', 0),
-                    counts.get('dynamic', 0),
-                    counts.get('other', 0)
-                ]
-            }
-            
-            st.bar_chart(chart_data, x='Type', y='Count', use_container_width=True)
-            
-        except Exception as e:
-            st.error(f"❌ Unable to load analytics: {str(e)}")
+    if active_tab == "💬 Chat Assistant":
+        chat_panel()
+    elif active_tab == "📁 Secret Browser":
+        secret_browser_tab()
+    else:
+        analytics_tab()
 
 # Footer
 st.markdown("---")